@@ -1,12 +1,13 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from .inference import (collect_multi_frames, inference_bottom_up_pose_model,
                         inference_gesture_model, inference_top_down_pose_model,
-                        init_pose_model, process_mmdet_results,
-                        vis_pose_result)
+                        inference_top_down_pose_model_batch, init_pose_model,
+                        process_mmdet_results, vis_pose_result)
 from .inference_3d import (extract_pose_sequence, inference_interhand_3d_model,
                            inference_mesh_model, inference_pose_lifter_model,
                            vis_3d_mesh_result, vis_3d_pose_result)
-from .inference_tracking import get_track_id, vis_pose_tracking_result
+from .inference_tracking import (PoseTrackingVisualizer, get_track_id,
+                                 vis_pose_tracking_result)
 from .test import multi_gpu_test, single_gpu_test
 from .train import init_random_seed, train_model
 
@@ -14,12 +15,14 @@ __all__ = [
     'train_model',
     'init_pose_model',
     'inference_top_down_pose_model',
+    'inference_top_down_pose_model_batch',
     'inference_bottom_up_pose_model',
     'multi_gpu_test',
     'single_gpu_test',
     'vis_pose_result',
     'get_track_id',
     'vis_pose_tracking_result',
+    'PoseTrackingVisualizer',
     'inference_pose_lifter_model',
     'vis_3d_pose_result',
     'inference_interhand_3d_model',
@@ -73,7 +73,8 @@ def _inference_single_pose_model(model,
                                  dataset='TopDownCocoDataset',
                                  dataset_info=None,
                                  return_heatmap=False,
-                                 use_multi_frames=False):
+                                 use_multi_frames=False,
+                                 bbox_img_indices=None):
     """Inference human bounding boxes.
 
     Note:
@@ -92,6 +93,10 @@ def _inference_single_pose_model(model,
         dataset_info (DatasetInfo): A class containing all dataset info.
         return_heatmap (bool): Flag to return heatmap, default: False
         use_multi_frames (bool): Flag to use multi frames for inference
+        bbox_img_indices (list[int], optional): Index of the image in
+            `imgs_or_paths` that each bounding box belongs to. If given,
+            bounding boxes from several single-frame images are inferred
+            in one batch. Default: None.
 
     Returns:
         ndarray[NxKx3]: Predicted pose x, y, score.
@@ -219,7 +224,7 @@ def _inference_single_pose_model(model,
         dataset_name = dataset
 
     batch_data = []
-    for bbox in bboxes:
+    for bbox_idx, bbox in enumerate(bboxes):
         # prepare data
         data = {
             'bbox':
@@ -251,10 +256,14 @@ def _inference_single_pose_model(model,
             else:
                 data['image_file'] = imgs_or_paths
         else:
-            if isinstance(imgs_or_paths, np.ndarray):
-                data['img'] = imgs_or_paths
+            if bbox_img_indices is not None:
+                img_or_path = imgs_or_paths[bbox_img_indices[bbox_idx]]
             else:
-                data['image_file'] = imgs_or_paths
+                img_or_path = imgs_or_paths
+            if isinstance(img_or_path, np.ndarray):
+                data['img'] = img_or_path
+            else:
+                data['image_file'] = img_or_path
 
         data = test_pipeline(data)
         batch_data.append(data)
@@ -415,6 +424,122 @@ def inference_top_down_pose_model(model,
     return pose_results, returned_outputs
 
 
+def inference_top_down_pose_model_batch(model,
+                                        imgs_or_paths,
+                                        person_results,
+                                        bbox_thr=None,
+                                        format='xywh',
+                                        dataset='TopDownCocoDataset',
+                                        dataset_info=None,
+                                        return_heatmap=False,
+                                        outputs=None):
+    """Inference a batch of images, each with a list of person bounding
+    boxes, in a single forward pass of the pose model.
+
+    Note:
+        - num_images: B
+        - num_people: P
+        - num_keypoints: K
+        - bbox height: H
+        - bbox width: W
+
+    Args:
+        model (nn.Module): The loaded pose model.
+        imgs_or_paths (list(str) | list(np.ndarray)): Image filenames or
+            loaded images. Each image is treated as a single frame.
+        person_results (list(list(dict))): The detected persons of each
+            image, in the same order as `imgs_or_paths`. See
+            :func:`inference_top_down_pose_model` for the content of each
+            person dict.
+        bbox_thr (float | None): Threshold for bounding boxes. Only bboxes
+            with higher scores will be fed into the pose detector.
+            If bbox_thr is None, all boxes will be used.
+        format (str): bbox format ('xyxy' | 'xywh'). Default: 'xywh'.
+        dataset (str): Dataset name, e.g. 'TopDownCocoDataset'.
+            It is deprecated. Please use dataset_info instead.
+        dataset_info (DatasetInfo): A class containing all dataset info.
+        return_heatmap (bool) : Flag to return heatmap, default: False
+        outputs (list(str) | tuple(str)) : Names of layers whose outputs
+            need to be returned. Default: None.
+
+    Returns:
+        tuple:
+        - pose_results (list[list[dict]]): The bbox & pose info of each \
+            image, in the same order as `imgs_or_paths`.
+        - returned_outputs (list[dict[np.ndarray[B*P, K, H, W] | \
+            torch.Tensor[B*P, K, H, W]]]): \
+            Output feature maps of the whole batch from layers specified \
+            in `outputs`. Includes 'heatmap' if `return_heatmap` is True.
+    """
+    assert len(imgs_or_paths) == len(person_results)
+    # get dataset info
+    if (dataset_info is None and hasattr(model, 'cfg')
+            and 'dataset_info' in model.cfg):
+        dataset_info = DatasetInfo(model.cfg.dataset_info)
+    if dataset_info is None:
+        warnings.warn(
+            'dataset is deprecated.'
+            'Please set `dataset_info` in the config.'
+            'Check https://github.com/open-mmlab/mmpose/pull/663'
+            ' for details.', DeprecationWarning)
+
+    # only two kinds of bbox format is supported.
+    assert format in ['xyxy', 'xywh']
+
+    pose_results = [[] for _ in imgs_or_paths]
+    returned_outputs = []
+
+    # flatten the person results of all images into one batch and keep
+    # track of the image each bbox comes from
+    batch_person_results = []
+    bbox_img_indices = []
+    for img_idx, img_person_results in enumerate(person_results):
+        for person_result in img_person_results:
+            if bbox_thr is not None:
+                assert len(person_result['bbox']) == 5
+                if person_result['bbox'][4] <= bbox_thr:
+                    continue
+            batch_person_results.append(person_result)
+            bbox_img_indices.append(img_idx)
+
+    if len(batch_person_results) == 0:
+        return pose_results, returned_outputs
+
+    bboxes = np.array([box['bbox'] for box in batch_person_results])
+    if format == 'xyxy':
+        bboxes_xyxy = bboxes
+        bboxes_xywh = bbox_xyxy2xywh(bboxes)
+    else:
+        # format is already 'xywh'
+        bboxes_xywh = bboxes
+        bboxes_xyxy = bbox_xywh2xyxy(bboxes)
+
+    with OutputHook(model, outputs=outputs, as_tensor=False) as h:
+        poses, heatmap = _inference_single_pose_model(
+            model,
+            imgs_or_paths,
+            bboxes_xywh,
+            dataset=dataset,
+            dataset_info=dataset_info,
+            return_heatmap=return_heatmap,
+            bbox_img_indices=bbox_img_indices)
+
+        if return_heatmap:
+            h.layer_outputs['heatmap'] = heatmap
+
+        returned_outputs.append(h.layer_outputs)
+
+    assert len(poses) == len(batch_person_results)
+    for pose, person_result, bbox_xyxy, img_idx in zip(
+            poses, batch_person_results, bboxes_xyxy, bbox_img_indices):
+        pose_result = person_result.copy()
+        pose_result['keypoints'] = pose
+        pose_result['bbox'] = bbox_xyxy
+        pose_results[img_idx].append(pose_result)
+
+    return pose_results, returned_outputs
+
+
 def inference_bottom_up_pose_model(model,
                                    img_or_path,
                                    dataset='BottomUpCocoDataset',
@@ -2,9 +2,21 @@
 import warnings
 from functools import partial
 
+import mmcv
 import numpy as np
 
-from mmpose.core import OneEuroFilter, oks_iou
+from mmpose.core import OneEuroFilter, imshow_bboxes, imshow_keypoints, oks_iou
+
+
+# colors to draw the targets with, picked by track_id
+_TRACKING_PALETTE = np.array([[255, 128, 0], [255, 153, 51], [255, 178, 102],
+                              [230, 230, 0], [255, 153, 255], [153, 204, 255],
+                              [255, 102, 255], [255, 51, 255],
+                              [102, 178, 255], [51, 153, 255],
+                              [255, 153, 153], [255, 102, 102], [255, 51, 51],
+                              [153, 255, 153], [102, 255, 102], [51, 255, 51],
+                              [0, 255, 0], [0, 0, 255], [255, 0, 0],
+                              [255, 255, 255]])
 
 
 def _compute_iou(bboxA, bboxB):
@@ -244,41 +256,12 @@ def get_track_id(results,
     return results, next_id
 
 
-def vis_pose_tracking_result(model,
-                             img,
-                             result,
-                             radius=4,
-                             thickness=1,
-                             kpt_score_thr=0.3,
-                             dataset='TopDownCocoDataset',
-                             dataset_info=None,
-                             show=False,
-                             out_file=None):
-    """Visualize the pose tracking results on the image.
+def _get_tracking_skeleton(dataset, dataset_info, radius):
+    """Get the keypoint number and skeleton used to draw tracking results.
 
-    Args:
-        model (nn.Module): The loaded detector.
-        img (str | np.ndarray): Image filename or loaded image.
-        result (list[dict]): The results to draw over `img`
-            (bbox_result, pose_result).
-        radius (int): Radius of circles.
-        thickness (int): Thickness of lines.
-        kpt_score_thr (float): The threshold to visualize the keypoints.
-        skeleton (list[tuple]): Default None.
-        show (bool):  Whether to show the image. Default True.
-        out_file (str|None): The filename of the output visualization image.
+    Returns:
+        tuple: The keypoint number, the skeleton and the keypoint radius.
     """
-    if hasattr(model, 'module'):
-        model = model.module
-
-    palette = np.array([[255, 128, 0], [255, 153, 51], [255, 178, 102],
-                        [230, 230, 0], [255, 153, 255], [153, 204, 255],
-                        [255, 102, 255], [255, 51, 255], [102, 178, 255],
-                        [51, 153, 255], [255, 153, 153], [255, 102, 102],
-                        [255, 51, 51], [153, 255, 153], [102, 255, 102],
-                        [51, 255, 51], [0, 255, 0], [0, 0, 255], [255, 0, 0],
-                        [255, 255, 255]])
-
     if dataset_info is None and dataset is not None:
         warnings.warn(
             'dataset is deprecated.'
@@ -347,6 +330,40 @@ def vis_pose_tracking_result(model,
         kpt_num = dataset_info.keypoint_num
         skeleton = dataset_info.skeleton
 
+    return kpt_num, skeleton, radius
+
+
+def vis_pose_tracking_result(model,
+                             img,
+                             result,
+                             radius=4,
+                             thickness=1,
+                             kpt_score_thr=0.3,
+                             dataset='TopDownCocoDataset',
+                             dataset_info=None,
+                             show=False,
+                             out_file=None):
+    """Visualize the pose tracking results on the image.
+
+    Args:
+        model (nn.Module): The loaded detector.
+        img (str | np.ndarray): Image filename or loaded image.
+        result (list[dict]): The results to draw over `img`
+            (bbox_result, pose_result).
+        radius (int): Radius of circles.
+        thickness (int): Thickness of lines.
+        kpt_score_thr (float): The threshold to visualize the keypoints.
+        skeleton (list[tuple]): Default None.
+        show (bool):  Whether to show the image. Default True.
+        out_file (str|None): The filename of the output visualization image.
+    """
+    if hasattr(model, 'module'):
+        model = model.module
+
+    palette = _TRACKING_PALETTE
+    kpt_num, skeleton, radius = _get_tracking_skeleton(dataset, dataset_info,
+                                                       radius)
+
     for res in result:
         track_id = res['track_id']
         bbox_color = palette[track_id % len(palette)]
@@ -365,3 +382,77 @@ def vis_pose_tracking_result(model,
             out_file=out_file)
 
     return img
+
+
+class PoseTrackingVisualizer:
+    """Visualize pose tracking results on video frames.
+
+    It draws the same as :func:`vis_pose_tracking_result`, but the skeleton
+    and the per-track colors are resolved once at construction instead of
+    on every frame, and all targets are drawn on a single copy of the
+    frame instead of one copy per target.
+
+    Args:
+        radius (int): Radius of circles.
+        thickness (int): Thickness of lines.
+        kpt_score_thr (float): The threshold to visualize the keypoints.
+        dataset (str): Dataset name, e.g. 'TopDownCocoDataset'.
+            It is deprecated. Please use dataset_info instead.
+        dataset_info (DatasetInfo): A class containing all dataset info.
+
+    Example:
+        >>> visualizer = PoseTrackingVisualizer(dataset_info=dataset_info)
+        >>> for img, pose_results in frames:
+        >>>     vis_img = visualizer.draw(img, pose_results)
+    """
+
+    def __init__(self,
+                 radius=4,
+                 thickness=1,
+                 kpt_score_thr=0.3,
+                 dataset='TopDownCocoDataset',
+                 dataset_info=None):
+        kpt_num, skeleton, radius = _get_tracking_skeleton(
+            dataset, dataset_info, radius)
+        self.skeleton = skeleton
+        self.radius = radius
+        self.thickness = thickness
+        self.kpt_score_thr = kpt_score_thr
+
+        palette = _TRACKING_PALETTE
+        self.bbox_colors = [tuple(color.tolist()) for color in palette]
+        self.pose_kpt_colors = [
+            palette[[i] * kpt_num] for i in range(len(palette))
+        ]
+        self.pose_link_colors = [
+            palette[[i] * len(skeleton)] for i in range(len(palette))
+        ]
+
+    def draw(self, img, result):
+        """Draw the pose tracking results of one frame.
+
+        Args:
+            img (str | np.ndarray): Image filename or loaded image. A loaded
+                image is not modified.
+            result (list[dict]): The results to draw over `img`
+                (bbox_result, pose_result).
+
+        Returns:
+            np.ndarray: The visualized image.
+        """
+        img = mmcv.imread(img).copy()
+        for res in result:
+            color_idx = res['track_id'] % len(self.bbox_colors)
+            if 'bbox' in res:
+                imshow_bboxes(
+                    img,
+                    np.vstack([res['bbox']]),
+                    labels=[res.get('label', None)],
+                    colors=self.bbox_colors[color_idx],
+                    show=False)
+            imshow_keypoints(img, [res['keypoints']], self.skeleton,
+                             self.kpt_score_thr,
+                             self.pose_kpt_colors[color_idx],
+                             self.pose_link_colors[color_idx], self.radius,
+                             self.thickness)
+        return img
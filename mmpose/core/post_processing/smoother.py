@@ -1,5 +1,4 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-import copy
 import warnings
 from typing import Dict, Union
 
@@ -142,7 +141,11 @@ class Smoother():
                 id2result = enumerate(results_t)
 
             for track_id, result in id2result:
-                result = copy.deepcopy(result)
+                # Only the keypoints are updated, so a shallow copy with a
+                # copied keypoint array is enough to keep the input intact.
+                # This avoids a costly deepcopy of every result per frame.
+                result = result.copy()
+                result[self.key] = result[self.key].copy()
                 result[self.key][:, :self.keypoint_dim] = poses[track_id][t]
                 updated_results_t.append(result)
 
@@ -1,5 +1,4 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-import math
 import os
 import warnings
 
@@ -184,17 +183,16 @@ def imshow_keypoints(img,
                 color = tuple(int(c) for c in pose_link_color[sk_id])
                 if show_keypoint_weight:
                     img_copy = img.copy()
-                    X = (pos1[0], pos2[0])
-                    Y = (pos1[1], pos2[1])
-                    mX = np.mean(X)
-                    mY = np.mean(Y)
-                    length = ((Y[0] - Y[1])**2 + (X[0] - X[1])**2)**0.5
-                    angle = math.degrees(math.atan2(Y[0] - Y[1], X[0] - X[1]))
+                    # cv2.line is much cheaper than rasterizing an
+                    # ellipse polygon with cv2.ellipse2Poly per link
                     stickwidth = 2
-                    polygon = cv2.ellipse2Poly(
-                        (int(mX), int(mY)), (int(length / 2), int(stickwidth)),
-                        int(angle), 0, 360, 1)
-                    cv2.fillConvexPoly(img_copy, polygon, color)
+                    cv2.line(
+                        img_copy,
+                        pos1,
+                        pos2,
+                        color,
+                        thickness=2 * stickwidth,
+                        lineType=cv2.LINE_AA)
                     transparency = max(
                         0, min(1, 0.5 * (kpts[sk[0], 2] + kpts[sk[1], 2])))
                     cv2.addWeighted(
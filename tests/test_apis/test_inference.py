@@ -9,7 +9,8 @@ import numpy as np
 
 from mmpose.apis import (collect_multi_frames, inference_bottom_up_pose_model,
                          inference_gesture_model,
-                         inference_top_down_pose_model, init_pose_model,
+                         inference_top_down_pose_model,
+                         inference_top_down_pose_model_batch, init_pose_model,
                          process_mmdet_results, vis_pose_result)
 from mmpose.datasets import DatasetInfo
 
@@ -258,6 +259,66 @@ def test_top_down_demo():
         dataset_info=dataset_info)
 
 
+def test_top_down_batch_demo():
+    pose_model = init_pose_model(
+        'configs/body/2d_kpt_sview_rgb_img/topdown_heatmap/'
+        'coco/res50_coco_256x192.py',
+        None,
+        device='cpu')
+    dataset_info = DatasetInfo(pose_model.cfg.data['test'].get(
+        'dataset_info', None))
+    video_path = 'tests/data/posetrack18/videos/000001_mpiinew_test/'\
+        '000001_mpiinew_test.mp4'
+    video = mmcv.VideoReader(video_path)
+    frames = video[:3]
+
+    person_results = [[{
+        'bbox': [50, 50, 100, 150, 0.5],
+        'track_id': 0
+    }, {
+        'bbox': [60, 60, 120, 160, 0.2],
+        'track_id': 1
+    }], [], [{
+        'bbox': [50, 75, 100, 150, 0.6],
+        'track_id': 0
+    }]]
+
+    pose_results, _ = inference_top_down_pose_model_batch(
+        pose_model,
+        frames,
+        person_results,
+        bbox_thr=0.3,
+        format='xyxy',
+        dataset_info=dataset_info)
+    assert [len(res) for res in pose_results] == [1, 0, 1]
+    assert pose_results[0][0]['track_id'] == 0
+    assert pose_results[0][0]['keypoints'].shape == (17, 3)
+
+    # the batch results should match the single frame inference
+    single_results, _ = inference_top_down_pose_model(
+        pose_model,
+        frames[2],
+        person_results[2],
+        format='xyxy',
+        dataset_info=dataset_info)
+    np.testing.assert_allclose(
+        pose_results[2][0]['keypoints'],
+        single_results[0]['keypoints'],
+        rtol=1e-4,
+        atol=1e-4)
+
+    # test when all bboxes are filtered out
+    pose_results, returned_outputs = inference_top_down_pose_model_batch(
+        pose_model,
+        frames,
+        person_results,
+        bbox_thr=0.9,
+        format='xyxy',
+        dataset_info=dataset_info)
+    assert pose_results == [[], [], []]
+    assert returned_outputs == []
+
+
 def test_bottom_up_demo():
 
     # build the pose model from a config file and a checkpoint file
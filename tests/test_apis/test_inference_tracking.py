@@ -1,7 +1,10 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import mmcv
+import numpy as np
 import pytest
 
-from mmpose.apis import (get_track_id, inference_bottom_up_pose_model,
+from mmpose.apis import (PoseTrackingVisualizer, get_track_id,
+                         inference_bottom_up_pose_model,
                          inference_top_down_pose_model, init_pose_model,
                          vis_pose_tracking_result)
 from mmpose.datasets.dataset_info import DatasetInfo
@@ -126,6 +129,41 @@ def test_top_down_pose_tracking_demo():
         pose_model, image_name, pose_results, dataset_info=dataset_info)
 
 
+def test_pose_tracking_visualizer():
+    pose_model = init_pose_model(
+        'configs/body/2d_kpt_sview_rgb_img/topdown_heatmap/'
+        'coco/res50_coco_256x192.py',
+        None,
+        device='cpu')
+    image_name = 'tests/data/coco/000000000785.jpg'
+    dataset_info = DatasetInfo(pose_model.cfg.data['test']['dataset_info'])
+    person_result = [{'bbox': [50, 50, 50, 100]}, {'bbox': [80, 60, 60, 90]}]
+    pose_results, _ = inference_top_down_pose_model(
+        pose_model,
+        image_name,
+        person_result,
+        format='xywh',
+        dataset_info=dataset_info)
+    pose_results, _ = get_track_id(pose_results, [], next_id=0)
+
+    img = mmcv.imread(image_name)
+    img_copy = img.copy()
+    visualizer = PoseTrackingVisualizer(dataset_info=dataset_info)
+    vis_img = visualizer.draw(img, pose_results)
+    # the visualizer draws the same as vis_pose_tracking_result
+    np.testing.assert_array_equal(
+        vis_img,
+        vis_pose_tracking_result(
+            pose_model, img, pose_results, dataset_info=dataset_info))
+    # the input image is not modified
+    np.testing.assert_array_equal(img, img_copy)
+
+    # test the deprecated dataset argument
+    with pytest.deprecated_call():
+        visualizer = PoseTrackingVisualizer(dataset='TopDownCocoDataset')
+    _ = visualizer.draw(image_name, pose_results)
+
+
 def test_bottom_up_pose_tracking_demo():
     # COCO demo
     # build the pose model from a config file and a checkpoint file
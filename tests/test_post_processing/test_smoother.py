@@ -141,3 +141,21 @@ class TestSmoother(TestCase):
                 # Check the pose shape is correct
                 self.assertEqual(result['keypoints'].shape,
                                  smoothed_result['keypoints'].shape)
+
+    def test_smooth_keeps_input(self):
+        smoother = self.build_smoother()
+        results = self.build_pose_results(
+            num_target=2, num_frame=5, has_track_id=True)
+        keypoints = [[res['keypoints'].copy() for res in results_t]
+                     for results_t in results]
+        smoothed_results = smoother.smooth(results)
+
+        for results_t, keypoints_t, smoothed_results_t in zip(
+                results, keypoints, smoothed_results):
+            for result, kpts, smoothed_result in zip(results_t, keypoints_t,
+                                                     smoothed_results_t):
+                # Check the input keypoints are not modified in place
+                np.testing.assert_array_equal(result['keypoints'], kpts)
+                self.assertIsNot(result, smoothed_result)
+                self.assertIsNot(result['keypoints'],
+                                 smoothed_result['keypoints'])
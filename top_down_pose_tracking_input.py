@@ -5,18 +5,343 @@
 Adding pose estimations to COCO JSON using the OpenMMLab framework
 """
 import os
+import queue
+import tempfile
+import threading
+import time
 import warnings
 from argparse import ArgumentParser
+from collections import defaultdict
 import json
 import cv2
+import numpy as np
 from datetime import datetime, date
 from mmpose.core import Smoother
-from mmpose.apis import (get_track_id, inference_top_down_pose_model,
-                         init_pose_model, process_mmdet_results,
-                         vis_pose_tracking_result)
+from mmpose.apis import (PoseTrackingVisualizer, get_track_id,
+                         inference_top_down_pose_model,
+                         inference_top_down_pose_model_batch,
+                         init_pose_model, process_mmdet_results)
 from mmpose.datasets import DatasetInfo
 from mmdet.apis import inference_detector, init_detector
 
+try:
+    from mmcv.runner import wrap_fp16_model
+except ImportError:
+    warnings.warn('auto_fp16 from mmpose will be deprecated from v0.15.0'
+                  'Please install mmcv>=1.1.4')
+    from mmpose.core import wrap_fp16_model
+
+try:
+    import ffmpegcv
+    has_ffmpegcv = True
+except (ImportError, ModuleNotFoundError):
+    has_ffmpegcv = False
+
+try:
+    import orjson
+    has_orjson = True
+except (ImportError, ModuleNotFoundError):
+    has_orjson = False
+
+# bound the inter-stage queues so decoded frames cannot pile up in memory
+QUEUE_SIZE = 8
+# frames waiting to be encoded by the background video writer
+WRITE_QUEUE_SIZE = 4
+
+
+class AnnotationJsonWriter:
+    """Write the COCO JSON results while streaming the annotations to disk.
+
+    Annotations are appended one per line to a temporary file as they are
+    produced and only stitched into the ``annotations`` array on
+    :meth:`close`, so they are never all held in memory. Used as a context
+    manager, the output is only written if the block exits cleanly and the
+    temporary file is removed otherwise.
+
+    Args:
+        path (str): Path of the output JSON file.
+        info (dict): The ``info`` section of the output.
+        categories (list[dict]): The ``categories`` section of the output.
+    """
+
+    def __init__(self, path, info, categories):
+        self.path = path
+        self.header = {'info': info, 'categories': categories}
+        self._part = tempfile.NamedTemporaryFile(
+            'w',
+            suffix='.part',
+            dir=os.path.dirname(os.path.abspath(path)),
+            delete=False)
+
+    def write(self, annotation):
+        if has_orjson:
+            self._part.write(orjson.dumps(annotation).decode())
+        else:
+            self._part.write(json.dumps(annotation))
+        self._part.write('\n')
+
+    def close(self):
+        self._part.close()
+        header = json.dumps(self.header)
+        with open(self.path, 'w') as fobj, open(self._part.name) as part:
+            fobj.write(header[:-1] + ', "annotations": [')
+            sep = '\n'
+            for line in part:
+                fobj.write(sep + line.rstrip('\n'))
+                sep = ',\n'
+            fobj.write(']}\n')
+        os.remove(self._part.name)
+
+    def discard(self):
+        """Drop the streamed annotations without writing the output."""
+        self._part.close()
+        os.remove(self._part.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class FrameDropper:
+    """Decide how many frames to skip so inference keeps up with the video.
+
+    It keeps a moving average of the inference time per frame and skips the
+    frames that arrive from the source while one frame is being inferred.
+
+    Args:
+        source_fps (float): The fps of the input video.
+        momentum (float): The weight of the history in the moving average
+            of the inference time. Default: 0.9
+    """
+
+    def __init__(self, source_fps, momentum=0.9):
+        self.source_fps = source_fps
+        self.momentum = momentum
+        self.avg_infer_time = None
+
+    def update(self, infer_time, num_frames):
+        """Record the time spent on inferring a batch of frames."""
+        frame_time = infer_time / num_frames
+        if self.avg_infer_time is None:
+            self.avg_infer_time = frame_time
+        else:
+            self.avg_infer_time = (
+                self.momentum * self.avg_infer_time +
+                (1 - self.momentum) * frame_time)
+
+    def num_frames_to_skip(self):
+        """Get the number of frames to skip after the current one."""
+        if self.avg_infer_time is None or not self.source_fps:
+            return 0
+        return max(0, round(self.source_fps * self.avg_infer_time) - 1)
+
+
+def load_json(json_path):
+    """Load a JSON file, parsing it with orjson when it is installed."""
+    if has_orjson:
+        with open(json_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(json_path) as f:
+        return json.load(f)
+
+
+def open_video_capture(video_path, nvdecode=False):
+    """Open the input video, optionally decoding on the GPU with NVDEC.
+
+    Returns:
+        tuple: The video capture, its fps and its (width, height).
+    """
+    if nvdecode:
+        assert has_ffmpegcv, 'Please install ffmpegcv to use --nvdecode.'
+        cap = ffmpegcv.VideoCaptureNV(video_path)
+        return cap, cap.fps, (cap.width, cap.height)
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    return cap, fps, size
+
+
+def open_video_writer(out_file, fps, size, nvencode=False):
+    """Open the output video, optionally encoding on the GPU with NVENC."""
+    if nvencode:
+        assert has_ffmpegcv, 'Please install ffmpegcv to use --nvencode.'
+        return ffmpegcv.VideoWriterNV(out_file, 'h264', fps)
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    return cv2.VideoWriter(out_file, fourcc, fps, size)
+
+
+def write_frames(video_writer, write_queue):
+    """Encode the visualized frames on a background thread."""
+    while True:
+        vis_img = write_queue.get()
+        if vis_img is None:
+            break
+        video_writer.write(vis_img)
+
+
+def put_or_stop(q, item, stop_event):
+    """Put an item into a bounded queue, giving up once the pipeline stops.
+
+    Returns:
+        bool: Whether the item was put into the queue.
+    """
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def get_or_stop(q, stop_event):
+    """Get an item from a queue, returning None once the pipeline stops."""
+    while not stop_event.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
+
+
+def run_stage(stage, stop_event, errors, *args, **kwargs):
+    """Run a pipeline stage on a worker thread.
+
+    An exception raised by the stage is stored in ``errors`` and stops the
+    whole pipeline, so the main thread can re-raise it instead of treating
+    the truncated stream as a normal end of the video.
+    """
+    try:
+        stage(*args, **kwargs)
+    except Exception as e:
+        errors.append(e)
+        stop_event.set()
+
+
+def build_person_results_by_frame(annotations, this_person_cat_id):
+    """Transform the input person annotations to person objects per frame.
+
+    This is done once for the whole video before it is read: the boxes of
+    all persons are converted from xywh to xyxy in one NumPy op and each
+    person object references a row of that array, so the capture stage
+    only has to look up the person objects of a frame.
+
+    Returns:
+        dict[int, list[dict]]: The person objects of each (0-based) frame.
+    """
+    frame_ids = []
+    person_annotations = []
+    for data in annotations:
+        if data["category_id"] != this_person_cat_id:
+            continue
+        if "frame_id" in data:
+            frame_ids.append(data["frame_id"])
+        elif "image_id" in data:
+            frame_ids.append(data["image_id"] - 1)
+        else:
+            continue
+        person_annotations.append(data)
+
+    person_results_by_frame = defaultdict(list)
+    if not person_annotations:
+        return person_results_by_frame
+    bboxes = np.asarray([data["bbox"] for data in person_annotations],
+                        dtype=np.float64)
+    bboxes[:, 2:4] += bboxes[:, 0:2]
+    bbox_score = 1.0
+    bboxes = np.hstack([bboxes, np.full((len(bboxes), 1), bbox_score)])
+    for frame_id, data, bbox in zip(frame_ids, person_annotations, bboxes):
+        person = {}
+        person['activity'] = ""
+        if "track_id" in data:
+            person['track_id'] = data["track_id"]
+        elif "attributes" in data and "track_id" in data["attributes"]:
+            person['track_id'] = data["attributes"]["track_id"]
+        if "occluded" in data:
+            person['occluded'] = data["occluded"]
+        elif "attributes" in data and "occluded" in data["attributes"]:
+            person['occluded'] = int(data["attributes"]["occluded"])
+        if "activity" in data:
+            person['activity'] = data["activity"]
+        elif "attributes" in data and "activity" in data["attributes"]:
+            person['activity'] = data["attributes"]["activity"]
+        person['bbox'] = bbox
+        person['category_id'] = 1
+        person_results_by_frame[frame_id].append(person)
+    return person_results_by_frame
+
+
+def read_frames(cap,
+                person_results_by_frame,
+                frame_queue,
+                stop_event,
+                frame_dropper=None):
+    """Capture stage: decode frames and collect their person boxes.
+
+    Frames are deliberately kept in host memory. The top-down test pipeline
+    crops every person with a CPU affine warp and only uploads the crops in
+    ``ToTensor``, and drawing and encoding need the host frame anyway, so
+    decoding into GPU memory would add a download instead of saving one.
+    """
+    try:
+        frame_id = 0
+        while cap.isOpened() and not stop_event.is_set():
+            flag, img = cap.read()
+            if not flag:
+                break
+            person_results = person_results_by_frame.get(frame_id, [])
+            if not put_or_stop(frame_queue, (frame_id, img, person_results),
+                               stop_event):
+                break
+            frame_id += 1
+            if frame_dropper is not None:
+                # skip without decoding when the cap supports it
+                grab = getattr(cap, 'grab', cap.read)
+                num_skip = frame_dropper.num_frames_to_skip()
+                for _ in range(num_skip):
+                    grab()
+                frame_id += num_skip
+    finally:
+        put_or_stop(frame_queue, None, stop_event)
+
+
+def estimate_poses(pose_model, frame_queue, pose_queue, stop_event,
+                   batch_size, frame_dropper=None, **inference_kwargs):
+    """Inference stage: run the top-down pose model on batches of frames."""
+    try:
+        end_of_stream = False
+        while not end_of_stream:
+            frame_ids, imgs, person_results = [], [], []
+            while len(frame_ids) < batch_size:
+                item = get_or_stop(frame_queue, stop_event)
+                if item is None:
+                    end_of_stream = True
+                    break
+                frame_ids.append(item[0])
+                imgs.append(item[1])
+                person_results.append(item[2])
+            if not frame_ids:
+                break
+            # the person boxes of all frames go through the model at once
+            start_time = time.perf_counter()
+            batch_pose_results, returned_outputs = \
+                inference_top_down_pose_model_batch(
+                    pose_model, imgs, person_results, **inference_kwargs)
+            if frame_dropper is not None:
+                frame_dropper.update(time.perf_counter() - start_time,
+                                     len(frame_ids))
+            for item in zip(frame_ids, imgs, batch_pose_results):
+                if not put_or_stop(pose_queue, item, stop_event):
+                    return
+    finally:
+        put_or_stop(pose_queue, None, stop_event)
+
 
 def main():
     parser = ArgumentParser()
@@ -35,8 +360,17 @@ def main():
         default='',
         help='Root of the output video file. '
         'Default not saving the visualization video.')
+    parser.add_argument(
+        '--no-viz',
+        action='store_true',
+        default=False,
+        help='Only write the JSON output, without drawing the results.')
     parser.add_argument(
         '--device', default='cuda:0', help='Device used for inference')
+    parser.add_argument(
+        '--nvdecode', action='store_true', help='Use NVIDIA decoder')
+    parser.add_argument(
+        '--nvencode', action='store_true', help='Use NVIDIA encoder')
     parser.add_argument(
         '--det-cat-id',
         type=int,
@@ -47,6 +381,24 @@ def main():
         type=float,
         default=0.3,
         help='Bounding box score threshold')
+    parser.add_argument(
+        '--fp16',
+        action='store_true',
+        help='Run the pose model in half precision (FP16). '
+        'Requires a CUDA device.')
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=8,
+        help='Number of frames fed to the pose model in one forward pass')
+    parser.add_argument(
+        '--drop-frames',
+        action='store_true',
+        help='Skip frames when inference can not keep up with the fps of '
+        'the video, e.g. for realtime use. Skipped frames get no pose '
+        'annotations and are not written to the output video. Frames are '
+        'then inferred one at a time and not buffered ahead, to bound the '
+        'latency. Can not be used with --smooth or --euro.')
     parser.add_argument(
         '--euro',
         action='store_true',
@@ -78,10 +430,24 @@ def main():
 
     args = parser.parse_args()
 
-    assert args.show or (args.out_video_root != '')
+    assert args.batch_size >= 1, '--batch-size must be at least 1'
+    # the smoothing filters assume consecutive frames
+    assert not (args.drop_frames and (args.smooth or args.euro)), \
+        '--drop-frames can not be used with --smooth or --euro'
+
+    if args.no_viz:
+        assert not args.show and args.out_video_root == '', \
+            '--no-viz can not be used with --show or --out-video-root'
+    else:
+        assert args.show or (args.out_video_root != '')
 
     pose_model = init_pose_model(
         args.pose_config, args.pose_checkpoint, device=args.device.lower())
+    if args.fp16:
+        assert args.device.lower().startswith('cuda'), \
+            '--fp16 requires a CUDA device'
+        # the model forward casts the input images to half precision itself
+        wrap_fp16_model(pose_model)
 
     dataset = pose_model.cfg.data['test']['type']
     dataset_info = pose_model.cfg.data['test'].get('dataset_info', None)
@@ -93,8 +459,15 @@ def main():
     else:
         dataset_info = DatasetInfo(dataset_info)
 
-    cap = cv2.VideoCapture(args.video_path)
-    fps = None
+    # resolve the skeleton and colors once instead of on every frame
+    visualizer = PoseTrackingVisualizer(
+        radius=args.radius,
+        thickness=args.thickness,
+        kpt_score_thr=args.kpt_thr,
+        dataset=dataset,
+        dataset_info=dataset_info)
+
+    cap, fps, size = open_video_capture(args.video_path, args.nvdecode)
 
     assert cap.isOpened(), f'Faild to load video file {args.video_path}'
 
@@ -105,14 +478,20 @@ def main():
         save_out_video = True
 
     if save_out_video:
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-                int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        videoWriter = cv2.VideoWriter(
+        videoWriter = open_video_writer(
             os.path.join(args.out_video_root,
-                         f'vid_output_{os.path.basename(args.video_path)}'), fourcc,
-            fps, size)
+                         f'vid_output_{os.path.basename(args.video_path)}'),
+            fps, size, args.nvencode)
+        # overlap video encoding with reading and inferring the next frames
+        write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        writer_failed = threading.Event()
+        writer_errors = []
+        video_writer_thread = threading.Thread(
+            target=run_stage,
+            args=(write_frames, writer_failed, writer_errors, videoWriter,
+                  write_queue),
+            daemon=True)
+        video_writer_thread.start()
 
     # build pose smoother for temporal refinement
     if args.euro:
@@ -129,12 +508,9 @@ def main():
     # e.g. use ('backbone', ) to return backbone feature
     output_layer_names = None
 
-    frame_id = 0
-    results = {}
     date_str = f"{date.today():%Y/%m/%d}"
-    results['info'] = {"description": os.path.basename(args.video_path), "data_created": date_str}
-    results['categories'] = []
-    results['annotations'] = []
+    info = {"description": os.path.basename(args.video_path), "data_created": date_str}
+    categories = []
 
     key_body_labels = ["nose", "left_eye","right_eye","left_ear","right_ear", "left_shoulder", "right_shoulder",  "left_elbow",
                        "right_elbow",  "left_wrist", "right_wrist", "left_hip", "right_hip", "left_knee", "right_knee", "left_ankle", "right_ankle"]
@@ -146,140 +522,140 @@ def main():
                         [8, 10], [1, 2], [0, 1], [0, 2], [1, 3], [2, 4],
                         [3, 5], [4, 6]],
                        "supercategory": "person"}
-    results["categories"].append(cat_dict_person)
+    categories.append(cat_dict_person)
+
+    output_file_path = "annotations.json"
+    if args.output_json_path:
+        output_file_path = args.output_json_path
 
     # Opening JSON file
-    json_f = open(args.input_json_path)
-    json_data = json.load(json_f)
-
-    for data in json_data["annotations"]:
-        for data in json_data["categories"]:
-            label_name = data["name"]
-            if label_name == "person":
-                this_person_cat_id = data["id"]
-
-    # put data from other objects then person to the result
-    for data in json_data["annotations"]:
-        category_id = data["category_id"]
-        if category_id == this_person_cat_id:
-            continue
-        dict_obj = {
-            'track_id': data["track_id"] if "track_id" in data else data["attributes"]["track_id"],
-            'frame_id': data["frame_id"] if "frame_id" in data  else data["attributes"]["image_id"],
-            'bbox': data["bbox"],
-            'occluded' : 0 if data.get("occluded") is None else data.get("occluded"),
-            'category_id': category_id
-        }
-        results['annotations'].append(dict_obj)
-
-    pose_results = []
-    print("Running inference..")
-    while (cap.isOpened()):
-        pose_results_last = pose_results
-        flag, img = cap.read()
-        if not flag:
-            break
-        person_results = []
-        #Transforming input data to person objects
+    json_data = load_json(args.input_json_path)
+
+    this_person_cat_id = next((data["id"] for data in json_data["categories"]
+                               if data["name"] == "person"), None)
+    assert this_person_cat_id is not None, \
+        f'No "person" category found in {args.input_json_path}'
+
+    person_results_by_frame = build_person_results_by_frame(
+        json_data["annotations"], this_person_cat_id)
+
+    with AnnotationJsonWriter(output_file_path, info,
+                              categories) as json_writer:
+        # put data from other objects then person to the result
         for data in json_data["annotations"]:
-            if "frame_id" in data:
-                frame_json_id = data["frame_id"]
-            elif "image_id" in data:
-                frame_json_id = data["image_id"] - 1
-            if frame_id != frame_json_id:
-                continue
             category_id = data["category_id"]
-            if category_id != this_person_cat_id:
+            if category_id == this_person_cat_id:
                 continue
-            person = {}
-            person['activity'] = ""
-            if "track_id" in data:
-                person['track_id'] = data["track_id"]
-            elif "attributes" in data and "track_id" in data["attributes"]:
-                person['track_id'] = data["attributes"]["track_id"]
-            if "occluded" in data:
-                person['occluded'] = data["occluded"]
-            elif "attributes" in data and "occluded" in data["attributes"]:
-                person['occluded'] = int(data["attributes"]["occluded"])
-            if "activity" in data:
-                person['activity'] = data["activity"]
-            elif "attributes" in data and "activity" in data["attributes"]:
-                person['activity'] = data["attributes"]["activity"]
-            bbox_score = 1.0
-            person['bbox'] = [data["bbox"][0],data["bbox"][1],data["bbox"][0]+data["bbox"][2],data["bbox"][1]+data["bbox"][3], bbox_score]
-            person['category_id'] = 1
-            person_results.append(person)
-
-        # test a single image, with a list of bboxes.
-        pose_results, returned_outputs = inference_top_down_pose_model(
-            pose_model,
-            img,
-            person_results,
-            bbox_thr=args.bbox_thr,
-            format='xyxy',
-            dataset=dataset,
-            dataset_info=dataset_info,
-            return_heatmap=return_heatmap,
-            outputs=output_layer_names)
-
-        # post-process the pose results with smoother
-        if smoother:
-            pose_results = smoother.smooth(pose_results)
-
-        # show the results
-        vis_img = vis_pose_tracking_result(
-            pose_model,
-            img,
-            pose_results,
-            radius=args.radius,
-            thickness=args.thickness,
-            dataset=dataset,
-            dataset_info=dataset_info,
-            kpt_score_thr=args.kpt_thr,
-            show=False)
-            
-        #Transforming pose_results to data output
-        for i in range(len(pose_results)):
-            pos_arr = pose_results[i]["keypoints"].flatten().tolist()
-            key_point = []
-            for pos in pos_arr:
-                key_point.append(round(pos,3))
-            if pose_results[i]["category_id"] ==  1:
+            dict_obj = {
+                'track_id': data["track_id"] if "track_id" in data else data["attributes"]["track_id"],
+                'frame_id': data["frame_id"] if "frame_id" in data  else data["attributes"]["image_id"],
+                'bbox': data["bbox"],
+                'occluded' : 0 if data.get("occluded") is None else data.get("occluded"),
+                'category_id': category_id
+            }
+            json_writer.write(dict_obj)
+
+        # capture -> inference -> post-processing, so the GPU is not idle while
+        # frames are decoded and results are drawn, encoded and collected
+        # when dropping frames, do not batch or buffer frames ahead of the
+        # model, otherwise the results lag far behind the source
+        if args.drop_frames:
+            queue_size, batch_size = 1, 1
+        else:
+            queue_size, batch_size = QUEUE_SIZE, args.batch_size
+        frame_queue = queue.Queue(maxsize=queue_size)
+        pose_queue = queue.Queue(maxsize=queue_size)
+        stop_event = threading.Event()
+        errors = []
+        frame_dropper = FrameDropper(fps) if args.drop_frames else None
+        workers = [
+            threading.Thread(
+                target=run_stage,
+                args=(read_frames, stop_event, errors, cap,
+                      person_results_by_frame, frame_queue, stop_event,
+                      frame_dropper),
+                daemon=True),
+            threading.Thread(
+                target=run_stage,
+                args=(estimate_poses, stop_event, errors, pose_model,
+                      frame_queue, pose_queue, stop_event, batch_size,
+                      frame_dropper),
+                kwargs=dict(
+                    bbox_thr=args.bbox_thr,
+                    format='xyxy',
+                    dataset=dataset,
+                    dataset_info=dataset_info,
+                    return_heatmap=return_heatmap,
+                    outputs=output_layer_names),
+                daemon=True)
+        ]
+        for worker in workers:
+            worker.start()
+
+        print("Running inference..")
+        while True:
+            item = get_or_stop(pose_queue, stop_event)
+            if item is None:
+                break
+            frame_id, img, pose_results = item
+
+            # post-process the pose results with smoother
+            if smoother:
+                pose_results = smoother.smooth(pose_results)
+
+            #Transforming pose_results to data output
+            for pose_result in pose_results:
+                if pose_result["category_id"] != 1:
+                    continue
+                # keypoints are float32, widen them so the JSON gets clean values
+                key_point = np.round(
+                    pose_result["keypoints"].astype(np.float64), 3).ravel().tolist()
+                bbox = pose_result["bbox"]
+                bbox_wh = np.round(bbox[2:4] - bbox[0:2], 3).tolist()
                 dict_obj = {
-                    'track_id': pose_results[i]["track_id"],
+                    'track_id': pose_result["track_id"],
                     'frame_id': frame_id,
                     'keypoints': key_point,
-                    'bbox': [pose_results[i]["bbox"][0], pose_results[i]["bbox"][1], round(pose_results[i]["bbox"][2]-pose_results[i]["bbox"][0],3),round(pose_results[i]["bbox"][3]-pose_results[i]["bbox"][1],3)],
-                    'occluded' : 0 if pose_results[i].get("occluded") is None else pose_results[i].get("occluded"),
-                    'activity': pose_results[i].get("activity"),
+                    'bbox': bbox[0:2].tolist() + bbox_wh,
+                    'occluded' : 0 if pose_result.get("occluded") is None else pose_result.get("occluded"),
+                    'activity': pose_result.get("activity"),
                     'category_id': 1
                     }
-            results['annotations'].append(dict_obj)
- 
-        if args.show:
-            cv2.imshow('Image', vis_img)
+                json_writer.write(dict_obj)
 
-        if save_out_video:
-            videoWriter.write(vis_img)
+            # show the results, skipped entirely for JSON only runs
+            if args.show or save_out_video:
+                vis_img = visualizer.draw(img, pose_results)
 
-        if args.show and cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+                if args.show:
+                    cv2.imshow('Image', vis_img)
 
-        print(f"Frame {frame_id}")
-        frame_id += 1
+                if save_out_video:
+                    # stop early if the encoder died instead of blocking forever
+                    if not put_or_stop(write_queue, vis_img, writer_failed):
+                        break
 
-    output_file_path = "annotations.json"
-    if args.output_json_path:
-        output_file_path = args.output_json_path
+                if args.show and cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
 
-    with open(output_file_path, "w") as fobj:
-      json.dump(results, fobj, indent=2)
-      print("save json file to /%s" % output_file_path)
+            print(f"Frame {frame_id}")
 
-    cap.release()
-    if save_out_video:
-        videoWriter.release()
-        print("save video to directory /%s/" % args.out_video_root)
+        stop_event.set()
+        for worker in workers:
+            worker.join()
+        if errors:
+            raise errors[0]
+
+        cap.release()
+        if save_out_video:
+            put_or_stop(write_queue, None, writer_failed)
+            video_writer_thread.join()
+            videoWriter.release()
+            if writer_errors:
+                raise writer_errors[0]
+            print("save video to directory /%s/" % args.out_video_root)
+
+    print("save json file to /%s" % output_file_path)
     if args.show:
         cv2.destroyAllWindows()
 
@@ -5,23 +5,195 @@
 Visualize COCO JSON using the OpenMMLab framework
 """
 import os
+import queue
+import threading
 import warnings
 from argparse import ArgumentParser
+from collections import defaultdict
 import json
 import cv2
-from numpy import empty
+import numpy as np
 
-from mmpose.apis import (get_track_id, inference_top_down_pose_model,
-                         init_pose_model, process_mmdet_results,
-                         vis_pose_tracking_result)
+from mmpose.apis import (PoseTrackingVisualizer, get_track_id,
+                         inference_top_down_pose_model, init_pose_model,
+                         process_mmdet_results)
 from mmpose.datasets import DatasetInfo
 
 from mmdet.apis import inference_detector, init_detector
 
+try:
+    import ffmpegcv
+    has_ffmpegcv = True
+except (ImportError, ModuleNotFoundError):
+    has_ffmpegcv = False
+
+try:
+    import orjson
+    has_orjson = True
+except (ImportError, ModuleNotFoundError):
+    has_orjson = False
+
+# bound the queue so decoded frames cannot pile up in memory
+QUEUE_SIZE = 8
+# frames waiting to be encoded by the background video writer
+WRITE_QUEUE_SIZE = 4
+
 def threewise(iterable):
     a = iter(iterable)
     return zip(a, a, a)
 
+def load_json(json_path):
+    """Load a JSON file, parsing it with orjson when it is installed."""
+    if has_orjson:
+        with open(json_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(json_path) as f:
+        return json.load(f)
+
+def open_video_capture(video_path, nvdecode=False):
+    """Open the input video, optionally decoding on the GPU with NVDEC.
+
+    Returns:
+        tuple: The video capture, its fps and its (width, height).
+    """
+    if nvdecode:
+        assert has_ffmpegcv, 'Please install ffmpegcv to use --nvdecode.'
+        cap = ffmpegcv.VideoCaptureNV(video_path)
+        return cap, cap.fps, (cap.width, cap.height)
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    return cap, fps, size
+
+def open_video_writer(out_file, fps, size, nvencode=False):
+    """Open the output video, optionally encoding on the GPU with NVENC."""
+    if nvencode:
+        assert has_ffmpegcv, 'Please install ffmpegcv to use --nvencode.'
+        return ffmpegcv.VideoWriterNV(out_file, 'h264', fps)
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    return cv2.VideoWriter(out_file, fourcc, fps, size)
+
+def write_frames(video_writer, write_queue):
+    """Encode the visualized frames on a background thread."""
+    while True:
+        vis_img = write_queue.get()
+        if vis_img is None:
+            break
+        video_writer.write(vis_img)
+
+def put_or_stop(q, item, stop_event):
+    """Put an item into a bounded queue, giving up once the pipeline stops.
+
+    Returns:
+        bool: Whether the item was put into the queue.
+    """
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def get_or_stop(q, stop_event):
+    """Get an item from a queue, returning None once the pipeline stops."""
+    while not stop_event.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
+
+def run_stage(stage, stop_event, errors, *args, **kwargs):
+    """Run a pipeline stage on a worker thread.
+
+    An exception raised by the stage is stored in ``errors`` and stops the
+    whole pipeline, so the main thread can re-raise it instead of treating
+    the truncated stream as a normal end of the video.
+    """
+    try:
+        stage(*args, **kwargs)
+    except Exception as e:
+        errors.append(e)
+        stop_event.set()
+
+def build_person_results_by_frame(annotations, this_person_cat_id):
+    """Transform the input person annotations to person objects per frame.
+
+    This is done once for the whole video before it is read: the boxes of
+    all persons are converted from xywh to xyxy in one NumPy op and each
+    person object references a row of that array, so the capture stage
+    only has to look up the person objects of a frame.
+
+    Returns:
+        dict[int, list[dict]]: The person objects of each (0-based) frame.
+    """
+    frame_ids = []
+    person_annotations = []
+    for data in annotations:
+        if data["category_id"] != this_person_cat_id:
+            continue
+        if "frame_id" in data:
+            frame_ids.append(data["frame_id"])
+        elif "image_id" in data:
+            frame_ids.append(data["image_id"] - 1)
+        else:
+            continue
+        person_annotations.append(data)
+
+    person_results_by_frame = defaultdict(list)
+    if not person_annotations:
+        return person_results_by_frame
+    bboxes = np.asarray([data["bbox"] for data in person_annotations],
+                        dtype=np.float64)
+    bboxes[:, 2:4] += bboxes[:, 0:2]
+    bbox_score = 1.0
+    bboxes = np.hstack([bboxes, np.full((len(bboxes), 1), bbox_score)])
+    for frame_id, data, bbox in zip(frame_ids, person_annotations, bboxes):
+        person = {}
+        person['activity'] = ""
+        if "track_id" in data:
+            person['track_id'] = data["track_id"]
+        elif "attributes" in data and "track_id" in data["attributes"]:
+            person['track_id'] = data["attributes"]["track_id"]
+        if "occluded" in data:
+            person['occluded'] = data["occluded"]
+        elif "attributes" in data and "occluded" in data["attributes"]:
+            person['occluded'] = int(data["attributes"]["occluded"])
+        if "activity" in data:
+            person['activity'] = data["activity"]
+        elif "attributes" in data and "activity" in data["attributes"]:
+            person['activity'] = data["attributes"]["activity"]
+        person['category_id'] = 1
+        person['bbox'] = bbox
+        person['frame_id'] = frame_id
+        person_key_points = []
+        if "keypoints" in data:
+            keypoints =  data["keypoints"]
+            for x, y, z in threewise(keypoints):
+                person_key_point = [x, y,z]
+                person_key_points.append(person_key_point)
+        person["keypoints"] = person_key_points
+        person_results_by_frame[frame_id].append(person)
+    return person_results_by_frame
+
+def read_frames(cap, person_results_by_frame, frame_queue, stop_event):
+    """Decode frames and collect their poses while the main thread draws."""
+    try:
+        frame_id = 0
+        while cap.isOpened() and not stop_event.is_set():
+            flag, img = cap.read()
+            if not flag:
+                break
+            pose_results = person_results_by_frame.get(frame_id, [])
+            if not put_or_stop(frame_queue, (frame_id, img, pose_results),
+                               stop_event):
+                break
+            frame_id += 1
+    finally:
+        put_or_stop(frame_queue, None, stop_event)
+
 def main():
     parser = ArgumentParser()
     parser.add_argument('pose_config', help='Config file for pose')
@@ -40,6 +212,10 @@ def main():
         'Default not saving the visualization video.')
     parser.add_argument(
         '--device', default='cuda:0', help='Device used for inference')
+    parser.add_argument(
+        '--nvdecode', action='store_true', help='Use NVIDIA decoder')
+    parser.add_argument(
+        '--nvencode', action='store_true', help='Use NVIDIA encoder')
     parser.add_argument(
         '--kpt-thr', type=float, default=0.3, help='Keypoint score threshold')
     parser.add_argument(
@@ -70,9 +246,16 @@ def main():
     else:
         dataset_info = DatasetInfo(dataset_info)
 
+    # resolve the skeleton and colors once instead of on every frame
+    visualizer = PoseTrackingVisualizer(
+        radius=args.radius,
+        thickness=args.thickness,
+        kpt_score_thr=args.kpt_thr,
+        dataset=dataset,
+        dataset_info=dataset_info)
+
 
-    cap = cv2.VideoCapture(args.video_path)
-    fps = None
+    cap, fps, size = open_video_capture(args.video_path, args.nvdecode)
 
     assert cap.isOpened(), f'Faild to load video file {args.video_path}'
 
@@ -83,98 +266,76 @@ def main():
         save_out_video = True
 
     if save_out_video:
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-                int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        videoWriter = cv2.VideoWriter(
+        videoWriter = open_video_writer(
             os.path.join(args.out_video_root,
-                         f'vid_output_{os.path.basename(args.video_path)}'), fourcc,
-            fps, size)
-
-    frame_id = 0
+                         f'vid_output_{os.path.basename(args.video_path)}'),
+            fps, size, args.nvencode)
+        # overlap video encoding with reading and drawing the next frames
+        write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        writer_failed = threading.Event()
+        writer_errors = []
+        video_writer_thread = threading.Thread(
+            target=run_stage,
+            args=(write_frames, writer_failed, writer_errors, videoWriter,
+                  write_queue),
+            daemon=True)
+        video_writer_thread.start()
 
     # Opening JSON file
-    json_f = open(args.json_path)
-    json_data = json.load(json_f)
+    json_data = load_json(args.json_path)
 
-    for data in json_data["annotations"]:
-        for data in json_data["categories"]:
-            label_name = data["name"]
-            if label_name == "person":
-                this_person_cat_id = data["id"]
+    this_person_cat_id = next((data["id"] for data in json_data["categories"]
+                               if data["name"] == "person"), None)
+    assert this_person_cat_id is not None, \
+        f'No "person" category found in {args.json_path}'
 
-    while (cap.isOpened()):
+    person_results_by_frame = build_person_results_by_frame(
+        json_data["annotations"], this_person_cat_id)
 
-        flag, img = cap.read()
-        if not flag:
-            break
+    frame_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    stop_event = threading.Event()
+    errors = []
+    reader = threading.Thread(
+        target=run_stage,
+        args=(read_frames, stop_event, errors, cap, person_results_by_frame,
+              frame_queue, stop_event),
+        daemon=True)
+    reader.start()
 
-        #Transforming data input to person objects
-        pose_results = []
-        for data in json_data["annotations"]:
-            if "frame_id" in data:
-                frame_json_id = data["frame_id"]
-            elif "image_id" in data:
-                frame_json_id = data["image_id"] - 1
-            if frame_id != frame_json_id:
-                continue
-            category_id = data["category_id"]
-            if category_id != this_person_cat_id:
-                continue
-            person = {}
-            person['activity'] = ""
-            if "track_id" in data:
-                person['track_id'] = data["track_id"]
-            elif "attributes" in data and "track_id" in data["attributes"]:
-                person['track_id'] = data["attributes"]["track_id"]
-            if "occluded" in data:
-                person['occluded'] = data["occluded"]
-            elif "attributes" in data and "occluded" in data["attributes"]:
-                person['occluded'] = int(data["attributes"]["occluded"])
-            if "activity" in data:
-                person['activity'] = data["activity"]
-            elif "attributes" in data and "activity" in data["attributes"]:
-                person['activity'] = data["attributes"]["activity"]
-            person['category_id'] = 1
-            person['bbox'] = [data["bbox"][0],data["bbox"][1],data["bbox"][0]+data["bbox"][2],data["bbox"][1]+data["bbox"][3],1.0]
-            person['frame_id'] = frame_id
-            person_key_points = []
-            if "keypoints" in data:
-                keypoints =  data["keypoints"]
-                for x, y, z in threewise(keypoints):
-                    person_key_point = [x, y,z]
-                    person_key_points.append(person_key_point)
-            person["keypoints"] = person_key_points
-            pose_results.append(person)
+    while True:
+        item = get_or_stop(frame_queue, stop_event)
+        if item is None:
+            break
+        frame_id, img, pose_results = item
 
         # show the results
-        vis_img = vis_pose_tracking_result(
-            pose_model,
-            img,
-            pose_results,
-            radius=args.radius,
-            thickness=args.thickness,
-            dataset=dataset,
-            dataset_info=dataset_info,
-            kpt_score_thr=args.kpt_thr,
-            show=False)
+        vis_img = visualizer.draw(img, pose_results)
 
         if args.show:
             cv2.imshow('Image', vis_img)
 
         if save_out_video:
-            videoWriter.write(vis_img)
+            # stop early if the encoder died instead of blocking forever
+            if not put_or_stop(write_queue, vis_img, writer_failed):
+                break
 
         if args.show and cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
         print(f"Frame {frame_id}")
-        frame_id += 1
+
+    stop_event.set()
+    reader.join()
+    if errors:
+        raise errors[0]
 
     cap.release()
     if save_out_video:
+        put_or_stop(write_queue, None, writer_failed)
+        video_writer_thread.join()
         videoWriter.release()
+        if writer_errors:
+            raise writer_errors[0]
         print("save video to directory /%s/" % args.out_video_root)
     if args.show:
         cv2.destroyAllWindows()